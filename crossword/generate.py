@@ -1,4 +1,5 @@
 import sys
+from collections import Counter, deque
 
 from crossword import *
 
@@ -10,10 +11,36 @@ class CrosswordCreator():
         Create new CSP crossword generate.
         """
         self.crossword = crossword
-        self.domains = {
-            var: self.crossword.words.copy()
+        # neighbours and overlaps never change once the crossword is built, so look them up once
+        self._neighbors = {
+            var: frozenset(self.crossword.neighbors(var))
+            for var in self.crossword.variables
+        }
+        self._overlaps = self.crossword.overlaps
+        # for each variable, a list of (neighbour, i, j) where var's ith character overlaps neighbour's jth
+        self._adj = {
+            var: [(neighbour, *self._overlaps[var, neighbour]) for neighbour in self._neighbors[var]]
             for var in self.crossword.variables
         }
+        self._n_vars = len(self.crossword.variables)
+        # words used by the partial assignment during backtracking
+        self._used_values = set()
+        # words are stored as bytes while solving, so comparing letters is a cheap int comparison;
+        # if any word has a character outside Latin-1, keep every word as a string instead
+        try:
+            words = [word.encode("latin-1") for word in self.crossword.words]
+            self._encoded = True
+        except UnicodeEncodeError:
+            words = list(self.crossword.words)
+            self._encoded = False
+        # group the vocabulary by word length, the only unary constraint on a variable
+        words_by_length = dict()
+        for word in words:
+            words_by_length.setdefault(len(word), set()).add(word)
+        self._words_by_length = {
+            length: frozenset(words) for length, words in words_by_length.items()
+        }
+        self.enforce_node_consistency()
 
     def letter_grid(self, assignment):
         """
@@ -91,7 +118,14 @@ class CrosswordCreator():
         """
         self.enforce_node_consistency()
         self.ac3()
-        return self.backtrack(dict())
+        self._used_values = set()
+        assignment = self.backtrack(dict())
+        if assignment is None:
+            return None
+        # convert words back to strings for printing and saving
+        if self._encoded:
+            return {var: word.decode("latin-1") for var, word in assignment.items()}
+        return assignment
 
     def enforce_node_consistency(self):
         """
@@ -99,10 +133,13 @@ class CrosswordCreator():
         (Remove any values that are inconsistent with a variable's unary
          constraints; in this case, the length of the word.)
         """
-        # loop over variables
-        for var in self.domains.keys():
-            # remove values from domain which don't have the same number of letters as the variable's length
-            self.domains[var] = {x for x in self.domains[var] if len(x) == var.length}
+        # each variable's domain is every word with the same number of letters as the variable's length
+        # variables of the same length share one frozen set of words: domains are only
+        # ever replaced with new sets, never changed in place, so no copy is needed
+        self.domains = {
+            var: self._words_by_length.get(var.length, frozenset())
+            for var in self.crossword.variables
+        }
 
     def revise(self, x, y):
         """
@@ -113,29 +150,22 @@ class CrosswordCreator():
         Return True if a revision was made to the domain of `x`; return
         False if no revision was made.
         """
-        revision = False
-
-        overlap = self.crossword.overlaps[x, y] 
+        overlap = self._overlaps[x, y]
         # overlap is None if no overlap, or (i, j), where x's ith character overlaps y's jth character
 
         # if no overlap, x is already arc consistent with y
         if overlap == None:
-            return revision
-        else:
-            # for each value in x's domain,
-            # check if there is a corresponding value for y
-            for x_word in self.domains[x].copy():
-                consistent_val = False
-                for y_word in self.domains[y]:
-                    if x_word[overlap[0]] == y_word[overlap[1]]:
-                        consistent_val = True
-                        break
-                # if no corresponding value for y, remove value from x's domain 
-                if not consistent_val:
-                    self.domains[x].remove(x_word)
-                    revision = True
-
-        return revision
+            return False
+
+        # letters that some value of y can place at the overlapping cell
+        y_letters = {y_word[overlap[1]] for y_word in self.domains[y]}
+        # if every letter x can place there is supported, no value needs removing
+        if {x_word[overlap[0]] for x_word in self.domains[x]} <= y_letters:
+            return False
+
+        # keep only values of x whose overlapping character is one of those letters
+        self.domains[x] = {x_word for x_word in self.domains[x] if x_word[overlap[0]] in y_letters}
+        return True
 
     def ac3(self, arcs=None):
         """
@@ -150,17 +180,22 @@ class CrosswordCreator():
         # if no arcs, begin with initial list of all arcs in the problem
         # each arc in arcs is a tuple (x, y) of a variable x and a different variable y
         # note for nodes A and B, you need to add both arcs A>B and B>A
+        # only overlapping variables constrain each other, so other pairs need no arc
         if arcs == None:
-            vars = list(self.crossword.variables)
-            arcs = []
-            for i in range(len(vars)):
-                for j in range(len(vars)):
-                    if i != j:
-                        arcs.append((vars[i], vars[j]))
-        
-        while len(arcs) != 0:
+            arcs = deque(
+                (x, y)
+                for x in self.crossword.variables
+                for y in self._neighbors[x]
+            )
+        else:
+            arcs = deque(arcs)
+        # track which arcs are currently queued so the same arc is never queued twice
+        queued = set(arcs)
+
+        while arcs:
             # remove an arc from the queue
-            x, y = arcs.pop(0)
+            x, y = arcs.popleft()
+            queued.discard((x, y))
             # enforce arc consistency
             if self.revise(x, y):
                 # if all values are removed from a domain, constraint satisfaction not possible
@@ -168,12 +203,11 @@ class CrosswordCreator():
                     return False
                 # else add additional arcs to queue to ensure still arc consistent
                 else:
-                    neighbours = self.crossword.neighbors(x)
-                    neighbours.remove(y)
-                    if neighbours:
-                        for node in neighbours:
+                    for node in self._neighbors[x] - {y}:
+                        if (node, x) not in queued:
                             arcs.append((node, x))
-        
+                            queued.add((node, x))
+
         return True
 
     def assignment_complete(self, assignment):
@@ -182,13 +216,32 @@ class CrosswordCreator():
         crossword variable); return False otherwise.
         """
         # check all crossword variables are in the assignment
-        return all(var in assignment.keys() for var in self.crossword.variables)
+        # (assignments only ever hold crossword variables, so comparing sizes is enough)
+        return len(assignment) == self._n_vars
 
-    def consistent(self, assignment):
+    def consistent(self, assignment, just_assigned=None):
         """
         Return True if `assignment` is consistent (i.e., words fit in crossword
         puzzle without conflicting characters); return False otherwise.
+
+        If `just_assigned` is given, the rest of `assignment` is assumed to be
+        consistent already (as during backtracking), so only the constraints
+        involving `just_assigned` are checked.
         """
+        if just_assigned is not None:
+            value = assignment[just_assigned]
+            # check value is distinct from the other words in use
+            if value in self._used_values:
+                return False
+            # check value is the correct length
+            if just_assigned.length != len(value):
+                return False
+            # check no conflicts with assigned neighbours
+            for neighbour, i, j in self._adj[just_assigned]:
+                if neighbour in assignment and value[i] != assignment[neighbour][j]:
+                    return False
+            return True
+
         # check all values are distinct
         if len(assignment.values()) != len(set(assignment.values())):
             return False
@@ -197,13 +250,10 @@ class CrosswordCreator():
             if var.length != len(assignment[var]):
                 return False
             # check no conflicts between neighbouring variables
-            neighbours = self.crossword.neighbors(var)
-            for neighbour in neighbours:
-                overlap = self.crossword.overlaps[var, neighbour]
-                if overlap:
-                    if neighbour in assignment:
-                        if assignment[var][overlap[0]] != assignment[neighbour][overlap[1]]:
-                            return False
+            for neighbour, i, j in self._adj[var]:
+                if neighbour in assignment:
+                    if assignment[var][i] != assignment[neighbour][j]:
+                        return False
         return True
 
     def order_domain_values(self, var, assignment):
@@ -216,16 +266,18 @@ class CrosswordCreator():
         # Simpler version:
         # return list(self.domains[var])
         domain_values = list(self.domains[var])
-        neighbours = self.crossword.neighbors(var)
-        unassigned_neighbours = [x for x in neighbours if x not in assignment]
 
         vals_ruled_out = {val: 0 for val in domain_values}
-        for val in domain_values:
-            for neighbour in unassigned_neighbours:
-                overlap = self.crossword.overlaps[var, neighbour]
-                for neighbour_val in self.domains[neighbour]:
-                    if val[overlap[0]] != neighbour_val[overlap[1]]:
-                        vals_ruled_out[val] += 1
+        for neighbour, i, j in self._adj[var]:
+            # assigned neighbours have no values left to rule out
+            if neighbour in assignment:
+                continue
+            # count how many of the neighbour's values have each letter at the overlap;
+            # a value for var rules out every neighbour value without its letter there
+            letter_counts = Counter(neighbour_val[j] for neighbour_val in self.domains[neighbour])
+            n_values = len(self.domains[neighbour])
+            for val in domain_values:
+                vals_ruled_out[val] += n_values - letter_counts[val[i]]
 
         domain_values.sort(key=lambda val: vals_ruled_out[val])
         return domain_values
@@ -243,9 +295,11 @@ class CrosswordCreator():
         # return remaining_variables[0]
         unassigned_variables = [var for var in self.crossword.variables if var not in assignment]
 
-        unassigned_variables.sort(key=lambda var: self.crossword.neighbors(var), reverse=True)
-        unassigned_variables.sort(key=lambda var: len(self.domains[var]))
-        return unassigned_variables[0]
+        # fewest remaining values first, then most neighbours
+        return min(
+            unassigned_variables,
+            key=lambda var: (len(self.domains[var]), -len(self._neighbors[var]))
+        )
 
     def backtrack(self, assignment):
         """
@@ -262,11 +316,26 @@ class CrosswordCreator():
         var = self.select_unassigned_variable(assignment)
         for value in self.order_domain_values(var, assignment):
             assignment[var] = value
-            if self.consistent(assignment):
+            # only constraints involving var can have been broken by this assignment
+            if not self.consistent(assignment, var):
+                assignment.pop(var)
+                continue
+            self._used_values.add(value)
+
+            # forward checking: restrict var to value and propagate to unassigned neighbours
+            # revise replaces domains rather than mutating them, so a shallow copy is enough to restore
+            saved_domains = self.domains.copy()
+            self.domains[var] = {value}
+            arcs = [(neighbour, var) for neighbour in self._neighbors[var] if neighbour not in assignment]
+            if self.ac3(arcs=arcs):
                 result = self.backtrack(assignment)
                 if result is not None:
                     return result
-                assignment.pop(var)
+
+            # undo the assignment and any inferences made from it
+            self.domains = saved_domains
+            self._used_values.discard(value)
+            assignment.pop(var)
 
         return None
 
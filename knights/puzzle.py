@@ -1,21 +1,21 @@
+import itertools
+
 from logic import *
 
+# Each character is either a knight or a knave, but not both,
+# so being a knave is represented as not being a knight
 AKnight = Symbol("A is a Knight")
-AKnave = Symbol("A is a Knave")
+AKnave = Not(AKnight)
 
 BKnight = Symbol("B is a Knight")
-BKnave = Symbol("B is a Knave")
+BKnave = Not(BKnight)
 
 CKnight = Symbol("C is a Knight")
-CKnave = Symbol("C is a Knave")
+CKnave = Not(CKnight)
 
 # Puzzle 0
 # A says "I am both a knight and a knave."
 knowledge0 = And(
-    # Information about the game:
-    # each character can be a knight or knave, but not both
-    Or(AKnight, AKnave),
-    Not(And(AKnight, AKnave)),
     # Information from what characters say:
     Biconditional(AKnight, And(AKnight, AKnave))
 )
@@ -24,11 +24,6 @@ knowledge0 = And(
 # A says "We are both knaves."
 # B says nothing.
 knowledge1 = And(
-    # Information about the game:
-    Or(AKnight, AKnave),
-    Not(And(AKnight, AKnave)),
-    Or(BKnight, BKnave),
-    Not(And(BKnight, BKnave)),
     # Information from what characters say:
     Biconditional(AKnight, And(AKnave, BKnave)),
 )
@@ -37,11 +32,6 @@ knowledge1 = And(
 # A says "We are the same kind."
 # B says "We are of different kinds."
 knowledge2 = And(
-    # Information about the game:
-    Or(AKnight, AKnave),
-    Not(And(AKnight, AKnave)),
-    Or(BKnight, BKnave),
-    Not(And(BKnight, BKnave)),
     # Information from what characters say:
     Biconditional(AKnight, Or(And(AKnight, BKnight), And(AKnave, BKnave))),
     Biconditional(BKnight, Or(And(AKnight, BKnave), And(AKnave, BKnight)))
@@ -53,13 +43,6 @@ knowledge2 = And(
 # B says "C is a knave."
 # C says "A is a knight."
 knowledge3 = And(
-    # Information about the game:
-    Or(AKnight, AKnave),
-    Not(And(AKnight, AKnave)),
-    Or(BKnight, BKnave),
-    Not(And(BKnight, BKnave)),
-    Or(CKnight, CKnave),
-    Not(And(CKnight, CKnave)),
     # Information from what characters say:
     # A says either "I am a knight." or "I am a knave.", but you don't know which.
     Or(
@@ -89,8 +72,22 @@ knowledge3 = And(
 )
 
 
+def satisfying_models(knowledge):
+    """
+    Returns a list of every model over the symbols in `knowledge`
+    in which `knowledge` is true.
+    """
+    symbols = sorted(knowledge.symbols())
+    models = []
+    for values in itertools.product([True, False], repeat=len(symbols)):
+        model = dict(zip(symbols, values))
+        if knowledge.evaluate(model):
+            models.append(model)
+    return models
+
+
 def main():
-    symbols = [AKnight, AKnave, BKnight, BKnave, CKnight, CKnave]
+    characters = [("A", AKnight), ("B", BKnight), ("C", CKnight)]
     puzzles = [
         ("Puzzle 0", knowledge0),
         ("Puzzle 1", knowledge1),
@@ -102,9 +99,16 @@ def main():
         if len(knowledge.conjuncts) == 0:
             print("    Not yet implemented.")
         else:
-            for symbol in symbols:
-                if model_check(knowledge, symbol):
-                    print(f"    {symbol}")
+            # knowledge entails a symbol if it is true in every model where knowledge is true,
+            # so enumerate those models once rather than model checking each symbol
+            models = satisfying_models(knowledge)
+            # a character is known to be a knave if they are a knight in none of the models
+            for character, knight in characters:
+                values = {model.get(knight.name) for model in models}
+                if values == {True}:
+                    print(f"    {character} is a Knight")
+                elif values == {False}:
+                    print(f"    {character} is a Knave")
 
 
 if __name__ == "__main__":
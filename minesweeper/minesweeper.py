@@ -29,6 +29,17 @@ class Minesweeper:
                 self.mines.add((i, j))
                 self.board[i][j] = True
 
+        # Mines never move, so count the mines next to every cell once
+        self._nearby_counts = [[0] * width for _ in range(height)]
+        for mine in self.mines:
+            for i in range(mine[0] - 1, mine[0] + 2):
+                for j in range(mine[1] - 1, mine[1] + 2):
+                    # Ignore the mine itself
+                    if (i, j) == mine:
+                        continue
+                    if 0 <= i < self.height and 0 <= j < self.width:
+                        self._nearby_counts[i][j] += 1
+
         # At first, player has found no mines
         self.mines_found = set()
 
@@ -58,22 +69,8 @@ class Minesweeper:
         not including the cell itself.
         """
 
-        # Keep count of nearby mines
-        count = 0
-
-        # Loop over all cells within one row and column
-        for i in range(cell[0] - 1, cell[0] + 2):
-            for j in range(cell[1] - 1, cell[1] + 2):
-                # Ignore the cell itself
-                if (i, j) == cell:
-                    continue
-
-                # Update count if cell in bounds and is mine
-                if 0 <= i < self.height and 0 <= j < self.width:
-                    if self.board[i][j]:
-                        count += 1
-
-        return count
+        i, j = cell
+        return self._nearby_counts[i][j]
 
     def won(self):
         """
@@ -99,12 +96,20 @@ class Sentence:
     def __str__(self):
         return f"{self.cells} = {self.count}"
 
+    def key(self):
+        """
+        Returns a hashable snapshot of the sentence, equal for equal sentences.
+        (Sentences change as cells are marked, so they are not hashable themselves.)
+        """
+        return frozenset(self.cells), self.count
+
     def known_mines(self):
         """
         Returns the set of all cells in self.cells known to be mines.
         """
         if len(self.cells) == self.count:
-            return self.cells
+            # return a copy, as marking these cells removes them from self.cells
+            return self.cells.copy()
         else:
             return set()
 
@@ -113,7 +118,8 @@ class Sentence:
         Returns the set of all cells in self.cells known to be safe.
         """
         if self.count == 0:
-            return self.cells
+            # return a copy, as marking these cells removes them from self.cells
+            return self.cells.copy()
         else:
             return set()
 
@@ -149,6 +155,9 @@ class MinesweeperAI:
         self.height = height
         self.width = width
 
+        # Every cell on the board, so available moves can be found by set difference
+        self._all_cells = {(i, j) for i in range(height) for j in range(width)}
+
         # Keep track of which cells have been clicked on
         self.moves_made = set()
 
@@ -158,6 +167,9 @@ class MinesweeperAI:
 
         # List of sentences about the game known to be true
         self.knowledge = []
+        # Keys of every sentence added to the knowledge base (see Sentence.key),
+        # so duplicate sentences can be detected without scanning the list
+        self._kb_keys = set()
 
     def mark_mine(self, cell):
         """
@@ -177,6 +189,21 @@ class MinesweeperAI:
         for sentence in self.knowledge:
             sentence.mark_safe(cell)
 
+    def add_sentence(self, sentence):
+        """
+        Adds a sentence to the knowledge base, unless it is empty or an
+        identical sentence has already been added.
+
+        Returns True if the sentence was added, False if not
+        """
+        key = sentence.key()
+        # an empty sentence carries no information
+        if not sentence.cells or key in self._kb_keys:
+            return False
+        self._kb_keys.add(key)
+        self.knowledge.append(sentence)
+        return True
+
     def nearby_cells(self, cell):
         """
         Returns a list of neighbouring cells on the board,
@@ -209,12 +236,15 @@ class MinesweeperAI:
             known_mines = (
                 sentence.known_mines()
             )  # set of cells known to be mines based on sentence
-            for cell in known_mines.copy():
+            for cell in known_mines:
                 self.mark_mine(cell)
             known_safes = sentence.known_safes()  # set of cells known to be safe based on sentence
-            for cell in known_safes.copy():
+            for cell in known_safes:
                 self.mark_safe(cell)
-        
+
+        # sentences whose cells have all been marked carry no more information
+        self.knowledge = [sentence for sentence in self.knowledge if sentence.cells]
+
         # if knowledge base has not changed, return False
         if len(self.mines) == orig_mines and len(self.safes) == orig_safes:
             return False
@@ -231,14 +261,20 @@ class MinesweeperAI:
         Returns True if the knowledge base has changed, False if not
         """
         knowledge_changed = False
-        for sentence1 in self.knowledge:
-            for sentence2 in self.knowledge:
-                set1 = sentence1.cells
+        # iterate over a snapshot; new sentences are picked up on the next pass by add_knowledge
+        knowledge = list(self.knowledge)
+        for sentence1 in knowledge:
+            set1 = sentence1.cells
+            # an empty sentence carries no information
+            if not set1:
+                continue
+            for sentence2 in knowledge:
                 set2 = sentence2.cells
+                if sentence1 is sentence2 or set1 == set2:
+                    continue
                 if set1.issubset(set2):
                     new_sentence = Sentence(set2 - set1, sentence2.count - sentence1.count)
-                    if new_sentence not in self.knowledge:
-                        self.knowledge.append(new_sentence)
+                    if self.add_sentence(new_sentence):
                         knowledge_changed = True
         return knowledge_changed
 
@@ -275,7 +311,7 @@ class MinesweeperAI:
                 nearby_cells.remove(cell)
                 count = count - 1
         sentence = Sentence(nearby_cells, count)
-        self.knowledge.append(sentence)
+        self.add_sentence(sentence)
 
         # Continually update knowledge until no new knowledge can be inferred
         knowledge_changed = True
@@ -286,17 +322,6 @@ class MinesweeperAI:
             if self.infer_knowledge():
                 knowledge_changed = True
 
-    def available_moves(self):
-        """
-        Returns all possible moves (i, j) that haven't already been made
-        """
-        all_moves = set()
-        for i in range(self.height):
-            for j in range(self.width):
-                all_moves.add((i, j))
-        available_moves = {move for move in all_moves if move not in self.moves_made}
-        return available_moves
-
     def make_safe_move(self):
         """
         Returns a safe cell to choose on the Minesweeper board.
@@ -306,12 +331,9 @@ class MinesweeperAI:
         This function may use the knowledge in self.mines, self.safes
         and self.moves_made, but should not modify any of those values.
         """
-        available_moves = self.available_moves()
-        for move in available_moves:
-            if move in self.safes:
-                return move
+        # safe cells that haven't already been chosen
         # if no safe move guaranteed, return None
-        return None
+        return next(iter(self.safes - self.moves_made), None)
 
     def make_random_move(self):
         """
@@ -320,9 +342,8 @@ class MinesweeperAI:
             1) have not already been chosen, and
             2) are not known to be mines
         """
-        available_moves = self.available_moves()
         # moves that haven't already been made, and not known to be a mine
-        moves = {move for move in available_moves if move not in self.mines}
+        moves = self._all_cells - self.moves_made - self.mines
 
         # if no such move possible, return None
         if len(moves) == 0:
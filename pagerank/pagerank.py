@@ -1,5 +1,4 @@
 import os
-import random
 import re
 import sys
 import numpy
@@ -7,18 +6,26 @@ import numpy
 DAMPING = 0.85
 SAMPLES = 10000
 
+# corpora with fewer pages than this are iterated with a dense transition matrix
+DENSE_LIMIT = 200
+
+# matches the target of each <a href="..."> link in a page
+HREF = re.compile(r"<a\s+(?:[^>]*?)href=\"([^\"]*)\"")
+
 
 def main():
     if len(sys.argv) != 2:
         sys.exit("Usage: python pagerank.py corpus")
     corpus = crawl(sys.argv[1])
+    # both methods rank the same pages, so sort them for printing only once
+    pages = sorted(corpus)
     ranks = sample_pagerank(corpus, DAMPING, SAMPLES)
     print(f"PageRank Results from Sampling (n = {SAMPLES})")
-    for page in sorted(ranks):
+    for page in pages:
         print(f"  {page}: {ranks[page]:.4f}")
     ranks = iterate_pagerank(corpus, DAMPING)
     print(f"PageRank Results from Iteration")
-    for page in sorted(ranks):
+    for page in pages:
         print(f"  {page}: {ranks[page]:.4f}")
 
 
@@ -36,15 +43,11 @@ def crawl(directory):
             continue
         with open(os.path.join(directory, filename)) as f:
             contents = f.read()
-            links = re.findall(r"<a\s+(?:[^>]*?)href=\"([^\"]*)\"", contents)
-            pages[filename] = set(links) - {filename}
+            pages[filename] = {match.group(1) for match in HREF.finditer(contents)} - {filename}
 
     # Only include links to other pages in the corpus
     for filename in pages:
-        pages[filename] = set(
-            link for link in pages[filename]
-            if link in pages
-        )
+        pages[filename] = {link for link in pages[filename] if link in pages}
 
     return pages
 
@@ -59,19 +62,16 @@ def transition_model(corpus, page, damping_factor):
     a link at random chosen from all pages in the corpus.
     """
     page_links = corpus[page]
-    page_probs = dict()
     # if page has no outgoing links, return a probability distribution that chooses randomly among all pages with equal probability
     if len(page_links) == 0:
-        for page in corpus:
-            page_probs[page] = 1 / len(corpus)
-    else:
-        for page in corpus:
-            # With probability 1 - damping_factor, the random surfer should randomly choose one of all pages in the corpus with equal probability
-            prob = (1 - damping_factor) / len(corpus)
-            if page in page_links:
-                # With probability damping_factor, the random surfer should randomly choose one of the links from page with equal probability
-                prob  = prob + damping_factor / len(page_links)
-            page_probs[page] = prob
+        return dict.fromkeys(corpus, 1 / len(corpus))
+
+    # With probability 1 - damping_factor, the random surfer should randomly choose one of all pages in the corpus with equal probability
+    page_probs = dict.fromkeys(corpus, (1 - damping_factor) / len(corpus))
+    # With probability damping_factor, the random surfer should randomly choose one of the links from page with equal probability
+    link_prob = damping_factor / len(page_links)
+    for link in page_links:
+        page_probs[link] += link_prob
     return page_probs
 
 
@@ -85,71 +85,101 @@ def sample_pagerank(corpus, damping_factor, n):
     PageRank values should sum to 1.
     """
     pages = list(corpus.keys())
-    # keep track of how many times each page has been visited (initially 0)
-    page_visits = {page: 0 for page in pages}
+    rng = numpy.random.default_rng()
+    # the transition model only depends on the current page, so compute each page's distribution once;
+    # row i holds the probabilities of moving from pages[i] to each page, in the same order as pages
+    transition_probs = numpy.array([
+        [model[page] for page in pages]
+        for model in (transition_model(corpus, page, damping_factor) for page in pages)
+    ])
+    # cumulative distributions, so a sample is the first page whose cumulative probability exceeds a uniform draw
+    transition_cdfs = transition_probs.cumsum(axis=1)
+    last_page = len(pages) - 1
+    # keep track of the page index of every sample, and count the visits to each page at the end
+    samples = numpy.empty(n, dtype=int)
     # first sample: choose from a page at random
-    sample = random.choice(pages)
-    page_visits[sample] = 1
-    # remaining samples: generate from previous sample using transition model
-    for i in range(1, n):
-        sample_trans_model = transition_model(corpus=corpus, page=sample, damping_factor=damping_factor)
-        options = list(sample_trans_model.keys())
-        option_probs = list(sample_trans_model.values())
-        sample = numpy.random.choice(options, p=option_probs)
-        page_visits[sample] += 1
+    sample = samples[0] = rng.integers(len(pages))
+    # remaining samples: generate from previous sample using transition model,
+    # drawing all the uniform random numbers needed in one go
+    uniforms = rng.random(n - 1)
+    for i, u in enumerate(uniforms, start=1):
+        # min guards against rounding leaving the last cumulative probability just below u
+        sample = samples[i] = min(numpy.searchsorted(transition_cdfs[sample], u, side="right"), last_page)
+    page_visits = numpy.bincount(samples, minlength=len(pages))
 
     # proportion of all the samples that corresponded to that page
-    pageranks = {k: v / n for k, v in page_visits.items()}
-    return pageranks
+    return dict(zip(pages, page_visits / n))
 
 
-def iterate_pagerank(corpus, damping_factor):
+def iterate_pagerank(corpus, damping_factor, nstart=None):
     """
     Return PageRank values for each page by iteratively updating
     PageRank values until convergence.
 
+    If `nstart` is given, it is a dictionary of initial PageRank values
+    for each page (e.g. estimates from sampling) to start iterating from,
+    rather than starting with all pages equally likely. A ValueError is
+    raised if any page is missing from `nstart`, or if its values are
+    negative or do not sum to more than 0.
+
     Return a dictionary where keys are page names, and values are
     their estimated PageRank value (a value between 0 and 1). All
     PageRank values should sum to 1.
     """
     pages = list(corpus.keys())
-    # start by assuming equally likely to be on any page
-    pageranks = {page: 1 / len(pages) for page in pages}
+    n_pages = len(pages)
+    index = {page: i for i, page in enumerate(pages)}
+
+    # store the links as parallel arrays of (linking page, linked page) indices,
+    # so summing over the pages that link to each page is a single numpy call
+    link_from = numpy.array([index[page] for page in pages for link in corpus[page]], dtype=int)
+    link_to = numpy.array([index[link] for page in pages for link in corpus[page]], dtype=int)
+    num_links = numpy.array([len(corpus[page]) for page in pages])
+    # interpret a page with no links as having 1 link for every page in the corpus
+    dangling = numpy.flatnonzero(num_links == 0)
+    # share of the linking page's rank passed along each link: 1 / number of links on that page
+    link_weights = 1 / num_links[link_from]
+
+    # probability surfer followed a link to each page:
+    # sum over each page i that links to page: pagerank of i / number of links on i
+    if n_pages < DENSE_LIMIT:
+        # for small corpora, a single dense matrix-vector product is fastest;
+        # row i of the matrix is the probability of following a link from page i to each page
+        link_probs = numpy.zeros((n_pages, n_pages))
+        link_probs[link_from, link_to] = link_weights
+        link_probs[dangling] = 1 / n_pages
+
+        def prob_link_followed(pageranks):
+            return pageranks @ link_probs
+    else:
+        def prob_link_followed(pageranks):
+            return numpy.bincount(
+                link_to, weights=pageranks[link_from] * link_weights, minlength=n_pages
+            ) + pageranks[dangling].sum() / n_pages
+
+    if nstart is None:
+        # start by assuming equally likely to be on any page
+        pageranks = numpy.full(n_pages, 1 / n_pages)
+    else:
+        # start from the given estimates, scaled so they sum to 1
+        missing = [page for page in pages if page not in nstart]
+        if missing:
+            raise ValueError(f"nstart has no starting value for pages: {', '.join(missing)}")
+        pageranks = numpy.array([nstart[page] for page in pages], dtype=float)
+        if not numpy.all(pageranks >= 0) or not pageranks.sum() > 0:
+            raise ValueError("nstart values must be non-negative and sum to more than 0")
+        pageranks /= pageranks.sum()
 
     # iteratively calculate new rank values using PageRank formula
     # until no PageRank value changes by more than 0.001
     max_pagerank_diff = numpy.inf
-    old_pageranks = pageranks
     while max_pagerank_diff > 0.001:
-        new_pageranks = {page: pagerank(page, corpus, old_pageranks, damping_factor) for page in pages}
-        max_pagerank_diff = 0
-        for i in pages:
-            pagerank_diff = new_pageranks[i] - old_pageranks[i]
-            if pagerank_diff > max_pagerank_diff:
-                max_pagerank_diff = pagerank_diff
-        old_pageranks = new_pageranks
-    return new_pageranks
-
-
-def pagerank(page, corpus, pageranks, damping_factor):
-    """
-    Return the PageRank of a given page,
-    the probability that a random surfer ends up on that page
-    """
-    prob_link_followed = 0  # probability surfer followed a link to the given page
-    for i in corpus:
-        # interpret a page with no links as having 1 link for every page in the corpus 
-        if len(corpus[i]) == 0:
-            pagerank_i = pageranks[i]
-            prob_link_followed += (pagerank_i / len(corpus))
-        # sum over each page i that links to page: pagerank of i / number of links on i
-        elif page in corpus[i]:
-            pagerank_i = pageranks[i]
-            links_i = len(corpus[i])
-            prob_link_followed += (pagerank_i / links_i)
-
-    new_pagerank = ((1-damping_factor) / len(corpus)) + (damping_factor * prob_link_followed)
-    return new_pagerank
+        # every page's new rank is computed from the previous iteration's ranks only,
+        # so all pages are updated together in one vectorised step
+        new_pageranks = ((1 - damping_factor) / n_pages) + (damping_factor * prob_link_followed(pageranks))
+        max_pagerank_diff = numpy.abs(new_pageranks - pageranks).max()
+        pageranks = new_pageranks
+    return dict(zip(pages, pageranks))
 
 
 if __name__ == "__main__":
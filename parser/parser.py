@@ -1,7 +1,8 @@
 import nltk
 import sys
 
-nltk.download('punkt_tab')
+# input is a single sentence, so words can be tokenized directly without the punkt sentence splitter
+word_tokenizer = nltk.tokenize.NLTKWordTokenizer()
 
 TERMINALS = """
 Adj -> "country" | "dreadful" | "enigmatical" | "little" | "moist" | "red"
@@ -60,11 +61,11 @@ def main():
             print(" ".join(np.flatten()))
 
 
-def contains_alnum(word):
-    for char in word:
-        if char.isalnum():
-            return True
-    return False
+def contains_alpha(word):
+    """
+    Return True if `word` contains at least one alphabetic character.
+    """
+    return any(char.isalpha() for char in word)
 
 
 def preprocess(sentence):
@@ -74,17 +75,9 @@ def preprocess(sentence):
     and removing any word that does not contain at least one alphabetic
     character.
     """
-    # split sentence into a list of words
-    word_list = nltk.tokenize.word_tokenize(sentence)
-    # convert to lowercase
-    word_list = [word.lower() for word in word_list]
-    # remove words that don't contain any alphabetic characters
-    word_list = [word for word in word_list if contains_alnum(word)]
-    return word_list
-
-
-def np_subtrees(tree):
-    return list(tree.subtrees(lambda t: t.label() == "NP"))
+    # convert to lowercase and split sentence into a list of words,
+    # removing words that don't contain any alphabetic characters
+    return [word for word in word_tokenizer.tokenize(sentence.lower()) if contains_alpha(word)]
 
 
 def np_chunk(tree):
@@ -94,8 +87,26 @@ def np_chunk(tree):
     whose label is "NP" that does not itself contain any other
     noun phrases as subtrees.
     """
-    np_sub = np_subtrees(tree)
-    np_chunks = [s for s in np_sub if len(np_subtrees(s)) == 1]
+    np_chunks = []
+
+    def add_chunks(subtree):
+        """
+        Add the noun phrase chunks within `subtree` to `np_chunks`,
+        returning True if `subtree` is or contains a noun phrase.
+        """
+        contains_np = False
+        for child in subtree:
+            # leaves are plain strings, not trees
+            if isinstance(child, nltk.Tree) and add_chunks(child):
+                contains_np = True
+        if subtree.label() == "NP":
+            if not contains_np:
+                np_chunks.append(subtree)
+            return True
+        return contains_np
+
+    # a single traversal of the tree, rather than searching each noun phrase again for noun phrases
+    add_chunks(tree)
     return np_chunks
 
 
@@ -2,13 +2,26 @@
 Tic Tac Toe Player
 """
 
-import copy
+import collections
+import functools
 import math
 
 X = "X"
 O = "O"
 EMPTY = None
 
+# Internally, a board is stored as a pair of 9-bit masks of the cells taken by X and by O,
+# where bit 3 * i + j is set if cell (i, j) is taken
+Board = collections.namedtuple("Board", "x o")
+FULL = 0o777
+# masks of the cells in each row, column and diagonal
+WINNING_MASKS = (0o007, 0o070, 0o700, 0o111, 0o222, 0o444, 0o421, 0o124)
+# cells in the order moves are searched: centre, then corners, then edges,
+# as stronger moves first lets alpha-beta pruning cut more of the search
+MOVE_ORDER = (4, 0, 2, 6, 8, 1, 3, 5, 7)
+# counts the cells in a mask: int.bit_count (Python 3.10+) is a single popcount instruction
+popcount = getattr(int, "bit_count", lambda mask: bin(mask).count("1"))
+
 
 def initial_state():
     """
@@ -19,54 +32,93 @@ def initial_state():
             [EMPTY, EMPTY, EMPTY]]
 
 
+def encode(board):
+    """
+    Returns the bitmask Board for a board given as a 3x3 list.
+    """
+    x = o = 0
+    for i in range(3):
+        for j in range(3):
+            if board[i][j] == X:
+                x |= 1 << (3 * i + j)
+            elif board[i][j] == O:
+                o |= 1 << (3 * i + j)
+    return Board(x, o)
+
+
 def player(board):
     """
     Returns player who has the next turn on a board.
     """
-    turn_count = 0
-    for row in board:
-        turn_count += len(list(filter(None, row)))
-    if turn_count % 2 == 0:
-        return "X"  # returning X won't print in runner.py
+    return board_player(encode(board))
+
+
+def board_player(b):
+    """
+    Returns player who has the next turn on a bitmask Board.
+    """
+    if popcount(b.x) > popcount(b.o):
+        return O
     else:
-        return "O"
+        return X
 
 
 def actions(board):
     """
     Returns set of all possible actions (i, j) available on the board.
     """
-    actions = set()
-    for i in range(3):
-        for j in range(3):
-            if board[i][j] is EMPTY:
-                actions.add((i, j))
-    return actions
+    return {divmod(k, 3) for k in board_actions(encode(board))}
+
+
+def board_actions(b):
+    """
+    Returns list of the empty cells k (for cell (k // 3, k % 3)) on a bitmask Board,
+    in MOVE_ORDER.
+    """
+    taken = b.x | b.o
+    return [k for k in MOVE_ORDER if not taken & (1 << k)]
 
 
 def result(board, action):
     """
     Returns the board that results from making move (i, j) on the board.
     """
-    if action not in actions(board):
+    i, j = action
+    # check the cell directly rather than building the set of all actions
+    if not (0 <= i < 3 and 0 <= j < 3) or board[i][j] is not EMPTY:
         raise Exception("Not a valid action for the given board")
-    
+
     current_player = player(board)
-    new_board = copy.deepcopy(board)
-    new_board[action[0]][action[1]] = current_player
+    new_board = [row.copy() for row in board]
+    new_board[i][j] = current_player
     return new_board
 
 
+def board_result(b, k):
+    """
+    Returns the bitmask Board that results from the current player taking cell k.
+    """
+    if board_player(b) == X:
+        return Board(b.x | (1 << k), b.o)
+    else:
+        return Board(b.x, b.o | (1 << k))
+
+
 def winner(board):
     """
     Returns the winner of the game, if there is one.
     """
-    flat_list = [move for row in board for move in row]
-    winning_positions = [[0,1,2], [3,4,5], [6,7,8], [0,3,6], [1,4,7], [2,5,8], [0,4,8], [2,4,6]]
-    for p in winning_positions:
-        if flat_list[p[0]] == flat_list[p[1]] == flat_list[p[2]] == X:
+    return board_winner(encode(board))
+
+
+def board_winner(b):
+    """
+    Returns the winner of the game on a bitmask Board, if there is one.
+    """
+    for mask in WINNING_MASKS:
+        if b.x & mask == mask:
             return X
-        elif flat_list[p[0]] == flat_list[p[1]] == flat_list[p[2]] == O:
+        if b.o & mask == mask:
             return O
     return None
 
@@ -75,18 +127,28 @@ def terminal(board):
     """
     Returns True if game is over, False otherwise.
     """
-    if winner(board) is not None:
-        return True
-    elif not any(EMPTY in row for row in board):
-        return True
-    return False
+    return board_terminal(encode(board))
+
+
+def board_terminal(b):
+    """
+    Returns True if game is over on a bitmask Board, False otherwise.
+    """
+    return (b.x | b.o) == FULL or board_winner(b) is not None
 
 
 def utility(board):
     """
     Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
     """
-    game_winner = winner(board)
+    return board_utility(encode(board))
+
+
+def board_utility(b):
+    """
+    Returns 1 if X has won the game on a bitmask Board, -1 if O has won, 0 otherwise.
+    """
+    game_winner = board_winner(b)
     if game_winner == X:
         return 1
     elif game_winner == O:
@@ -99,58 +161,75 @@ def minimax(board):
     """
     Returns the optimal action for the current player on the board
     """
-    if terminal(board):
+    b = encode(board)
+    if board_terminal(b):
         return None
-    
-    current_player = player(board)
+
+    current_player = board_player(b)
 
     if current_player == X:
-        best_score, best_action = max_value(board)
+        best_score, best_move = max_value(b)
     else:
-        best_score, best_action = min_value(board)
-    
-    return best_action
+        best_score, best_move = min_value(b)
 
+    return divmod(best_move, 3)
 
-def max_value(board):
+
+# Boards are hashable and there are only a few thousand reachable positions,
+# so each position's value is only searched once for a given alpha and beta
+@functools.lru_cache(maxsize=None)
+def max_value(b, alpha=-1, beta=1):
     """
-    Recursively simulates all possible games from current state until reach a terminal state
-    Returns the terminal state with maximum utility and corresponding action
+    Recursively simulates all possible games from current bitmask Board until reach a terminal state
+    Returns the terminal state with maximum utility and corresponding cell
+
+    `alpha` and `beta` are the best utilities max and min are already guaranteed
+    elsewhere in the search; moves are not explored once min can avoid this state
+    (utilities lie between -1 and 1, so the default bounds cover every outcome)
     """
     max_value = -math.inf
     best_move = None
 
-    if terminal(board):
-        return utility(board), None
-    
-    for action in actions(board):
-        val, _ = min_value(result(board, action)) 
+    if board_terminal(b):
+        return board_utility(b), None
+
+    for k in board_actions(b):
+        val, _ = min_value(board_result(b, k), alpha, beta)
         if val > max_value:
             max_value = val
-            best_move = action
-        if val == 1:  # alpha-beta pruning: max utility possible is 1
+            best_move = k
+        # alpha-beta pruning: min will never let the game reach this state
+        alpha = max(alpha, val)
+        if alpha >= beta:
             break
 
     return max_value, best_move
 
 
-def min_value(board):
+@functools.lru_cache(maxsize=None)
+def min_value(b, alpha=-1, beta=1):
     """
-    Recursively simulates all possible games from current state until reach a terminal state
-    Returns the terminal state with minimum utility and corresponding action
+    Recursively simulates all possible games from current bitmask Board until reach a terminal state
+    Returns the terminal state with minimum utility and corresponding cell
+
+    `alpha` and `beta` are the best utilities max and min are already guaranteed
+    elsewhere in the search; moves are not explored once max can avoid this state
+    (utilities lie between -1 and 1, so the default bounds cover every outcome)
     """
     min_value = math.inf
     best_move = None
 
-    if terminal(board):
-        return utility(board), None
-    
-    for action in actions(board):
-        val, _ = max_value(result(board, action))
+    if board_terminal(b):
+        return board_utility(b), None
+
+    for k in board_actions(b):
+        val, _ = max_value(board_result(b, k), alpha, beta)
         if val < min_value:
             min_value = val
-            best_move = action
-        if val == -1:  # alpha-beta pruning: min utility possible is -1
+            best_move = k
+        # alpha-beta pruning: max will never let the game reach this state
+        beta = min(beta, val)
+        if alpha >= beta:
             break
 
     return min_value, best_move